@@ -27,3 +27,4 @@ ALLOWED_EXTENSIONS = [".owl", ".rdf", ".xml"]
 
 # 缓存配置
 CACHE_TTL = 3600  # 1 hour
+SEARCH_CACHE_SIZE = 256  # 缓存最近的搜索结果数量
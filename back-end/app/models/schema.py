@@ -1,7 +1,8 @@
 """
 数据模型定义
 """
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, NamedTuple
 from pydantic import BaseModel, Field
 
 
@@ -31,6 +32,38 @@ class TreeNode(BaseModel):
     parents: List[ParentRelation] = Field(default_factory=list, description="父节点列表")
 
 
+class ParentLink(NamedTuple):
+    """父节点关系（内部缓存使用，字段与 ParentRelation 一致）"""
+    parentId: str
+    relationType: str
+
+
+class ChildLink(NamedTuple):
+    """子节点关系（内部缓存使用，字段与 ChildRelation 一致）"""
+    childId: str
+    relationType: str
+
+
+@dataclass(slots=True)
+class TreeNodeRecord:
+    """
+    本体术语节点（内部缓存使用）
+
+    字段与 TreeNode 一致，但不携带 pydantic 的校验与实例开销；
+    接口返回时由 FastAPI 按 response_model 转换为 TreeNode。
+    """
+    id: str
+    label: Optional[str] = None
+    label_zh: Optional[str] = None
+    definition: Optional[str] = None
+    definition_zh: Optional[str] = None
+    iri: Optional[str] = None
+    isLeaf: bool = True
+    count: Optional[int] = 0
+    children: List[ChildLink] = field(default_factory=list)
+    parents: List[ParentLink] = field(default_factory=list)
+
+
 class ExportResponse(BaseModel):
     """导出响应模型"""
     message: str = Field(..., description="响应消息")
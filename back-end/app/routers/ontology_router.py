@@ -9,10 +9,13 @@ from app.core.config import OWL_FILE_PATH
 
 router = APIRouter(prefix="/ontology", tags=["Ontology"])
 
+# 进程内共享的本体服务实例，保证解析缓存可跨请求复用
+ontology_service = OntologyService(str(OWL_FILE_PATH))
 
-def get_ontology_service() -> OntologyService:
+
+async def get_ontology_service() -> OntologyService:
     """获取本体服务实例"""
-    return OntologyService(str(OWL_FILE_PATH))
+    return ontology_service
 
 
 @router.get(
@@ -33,6 +36,53 @@ async def get_all_terms(
     return service.get_all_terms()
 
 
+# 固定路径的路由须定义在 /terms/{term_id} 之前，否则会被当作术语ID匹配
+@router.get(
+    "/terms/search",
+    response_model=List[TreeNode],
+    summary="搜索本体术语",
+    description="根据标签或定义搜索本体术语"
+)
+async def search_terms(
+    q: str = Query(..., description="搜索关键词"),
+    service: OntologyService = Depends(get_ontology_service)
+) -> List[TreeNode]:
+    """
+    搜索本体术语
+    
+    Args:
+        q: 搜索关键词
+        
+    Returns:
+        List[TreeNode]: 匹配的术语列表
+    """
+    return service.search_terms(q)
+
+
+@router.get(
+    "/terms/prefix-search",
+    response_model=List[TreeNode],
+    summary="按标签前缀搜索本体术语",
+    description="返回英文或中文标签以指定前缀开头的术语，用于输入联想"
+)
+async def prefix_search_terms(
+    q: str = Query(..., min_length=1, description="标签前缀"),
+    limit: int = Query(20, ge=1, le=100, description="最多返回的术语数量"),
+    service: OntologyService = Depends(get_ontology_service)
+) -> List[TreeNode]:
+    """
+    按标签前缀搜索本体术语
+    
+    Args:
+        q: 标签前缀
+        limit: 最多返回的术语数量
+        
+    Returns:
+        List[TreeNode]: 匹配的术语列表
+    """
+    return service.prefix_search(q, limit)
+
+
 @router.get(
     "/terms/{term_id}",
     response_model=TreeNode,
@@ -64,28 +114,6 @@ async def get_term_by_id(
     return term
 
 
-@router.get(
-    "/terms/search",
-    response_model=List[TreeNode],
-    summary="搜索本体术语",
-    description="根据标签或定义搜索本体术语"
-)
-async def search_terms(
-    q: str = Query(..., description="搜索关键词"),
-    service: OntologyService = Depends(get_ontology_service)
-) -> List[TreeNode]:
-    """
-    搜索本体术语
-    
-    Args:
-        q: 搜索关键词
-        
-    Returns:
-        List[TreeNode]: 匹配的术语列表
-    """
-    return service.search_terms(q)
-
-
 @router.post(
     "/export",
     response_model=ExportResponse,
@@ -93,16 +121,20 @@ async def search_terms(
     description="将本体数据导出为JSON文件"
 )
 async def export_ontology(
+    pretty: bool = Query(False, description="是否缩进格式化输出 JSON"),
     service: OntologyService = Depends(get_ontology_service)
 ) -> ExportResponse:
     """
     导出本体数据为JSON文件
     
+    Args:
+        pretty: 是否缩进格式化输出 JSON
+        
     Returns:
         ExportResponse: 导出结果信息
     """
     try:
-        output_file = service.export_to_json()
+        output_file = service.export_to_json(pretty=pretty)
         return ExportResponse(
             message="Ontology data exported successfully",
             file_path=output_file,
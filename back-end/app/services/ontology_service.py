@@ -1,12 +1,23 @@
 """
 本体服务层
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from app.utils.ontology_parser import parse_ontology, save_nodes_to_json
-from app.models.schema import TreeNode, StatisticsResponse
+from app.models.schema import TreeNodeRecord, StatisticsResponse
+from app.core.config import SEARCH_CACHE_SIZE
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
 import os
+import pickle
 from pathlib import Path
 
+# 关系类型的单字节编码，用于紧凑存储所有父子关系
+RELATION_CODES = {"subClassOf": 0, "partOf": 1}
+
+# 解析结果磁盘缓存的格式版本，TreeNodeRecord 结构变化时需递增
+PARSED_CACHE_VERSION = 2
+
 
 class OntologyService:
     """本体服务类"""
@@ -21,8 +32,14 @@ class OntologyService:
         self.owl_file_path = owl_file_path
         self._cache = None
         self._cache_timestamp = None
+        self._search_pool: List[Tuple[TreeNodeRecord, str]] = []
+        self._search_results: "OrderedDict[str, List[TreeNodeRecord]]" = OrderedDict()
+        self._edge_relations = b""
+        self._max_depth = 0
+        self._prefix_keys: List[str] = []
+        self._prefix_terms: List[TreeNodeRecord] = []
     
-    def _get_parsed_data(self) -> Dict[str, TreeNode]:
+    def _get_parsed_data(self) -> Dict[str, TreeNodeRecord]:
         """获取解析后的数据（带缓存）"""
         import time
         current_time = time.time()
@@ -32,22 +49,172 @@ class OntologyService:
             self._cache_timestamp is None or 
             current_time - self._cache_timestamp > 3600):
             
-            self._cache = parse_ontology(self.owl_file_path)
+            self._cache = self._load_or_parse()
             self._cache_timestamp = current_time
+            self._search_pool = self._build_search_pool(self._cache)
+            self._search_results.clear()
+            self._edge_relations = self._build_edge_relations(self._cache)
+            self._max_depth = self._compute_max_depth(self._cache)
+            self._prefix_keys, self._prefix_terms = self._build_prefix_index(self._cache)
         
         return self._cache
     
-    def get_all_terms(self) -> List[TreeNode]:
+    def _load_or_parse(self) -> Dict[str, TreeNodeRecord]:
+        """
+        优先从磁盘缓存加载解析结果，OWL 文件修改后重新解析并写回缓存
+        
+        缓存文件与 OWL 文件同目录（如 psi-ms-zh.cache.pkl），
+        以 OWL 文件的修改时间作为有效性校验，供服务重启和多 worker 共享。
+        
+        Returns:
+            Dict[str, TreeNodeRecord]: 解析后的节点字典
+        """
+        cache_path = Path(self.owl_file_path).with_suffix(".cache.pkl")
+        owl_mtime = os.path.getmtime(self.owl_file_path)
+        
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if (cached.get("version") == PARSED_CACHE_VERSION and
+                    cached.get("mtime") == owl_mtime):
+                return cached["nodes"]
+        except Exception:
+            # 缓存不存在、损坏或与当前代码不兼容时直接重新解析
+            pass
+        
+        nodes = parse_ontology(self.owl_file_path)
+        
+        # 先写临时文件再原子替换，避免其他 worker 读到写了一半的缓存
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    {"version": PARSED_CACHE_VERSION, "mtime": owl_mtime, "nodes": nodes},
+                    f,
+                    protocol=5
+                )
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"⚠️  无法写入解析缓存 {cache_path}: {str(e)}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+        
+        return nodes
+    
+    @staticmethod
+    def _build_edge_relations(data: Dict[str, TreeNodeRecord]) -> bytes:
+        """
+        将所有父子关系的类型编码为连续的字节序列（每条关系一个字节）
+        
+        Args:
+            data: 解析后的节点字典
+            
+        Returns:
+            bytes: 关系类型编码，取值见 RELATION_CODES，未知类型为 0xFF
+        """
+        return bytes(
+            RELATION_CODES.get(parent.relationType, 0xFF)
+            for term in data.values()
+            for parent in term.parents
+        )
+    
+    @staticmethod
+    def _compute_max_depth(data: Dict[str, TreeNodeRecord]) -> int:
+        """
+        计算本体的最大深度（根节点深度为 1，子节点深度为其最深父节点深度加 1）
+        
+        将子节点邻接表压缩为 CSR 数组（indptr / neighbors），
+        按 Kahn 拓扑序迭代：depth[child] = max(depth[child], depth[parent] + 1)，
+        每个节点和每条关系只处理一次。处于环中的节点不参与计算。
+        
+        Args:
+            data: 解析后的节点字典
+            
+        Returns:
+            int: 最大深度，无节点时为 0
+        """
+        node_index = {node_id: i for i, node_id in enumerate(data)}
+        node_count = len(node_index)
+        
+        # CSR：节点 i 的子节点下标为 neighbors[indptr[i]:indptr[i + 1]]
+        indptr = array("i", [0])
+        neighbors = array("i")
+        in_degree = array("i", bytes(4 * node_count))
+        for term in data.values():
+            for child in term.children:
+                child_index = node_index[child.childId]
+                neighbors.append(child_index)
+                in_degree[child_index] += 1
+            indptr.append(len(neighbors))
+        
+        depth = array("i", bytes(4 * node_count))
+        queue = [i for i in range(node_count) if in_degree[i] == 0]
+        for i in queue:
+            depth[i] = 1
+        
+        # queue 在遍历中追加，依次处理入度降为 0 的节点
+        for node in queue:
+            child_depth = depth[node] + 1
+            for child_index in neighbors[indptr[node]:indptr[node + 1]]:
+                if depth[child_index] < child_depth:
+                    depth[child_index] = child_depth
+                in_degree[child_index] -= 1
+                if in_degree[child_index] == 0:
+                    queue.append(child_index)
+        
+        return max(depth, default=0)
+    
+    @staticmethod
+    def _build_prefix_index(data: Dict[str, TreeNodeRecord]) -> Tuple[List[str], List[TreeNodeRecord]]:
+        """
+        构建按小写标签排序的前缀索引（英文与中文标签均收录）
+        
+        Args:
+            data: 解析后的节点字典
+            
+        Returns:
+            Tuple[List[str], List[TreeNodeRecord]]: 有序的标签键及对应术语
+        """
+        entries = sorted(
+            (label.lower(), index, term)
+            for index, term in enumerate(data.values())
+            for label in {term.label, term.label_zh}
+            if label
+        )
+        return [key for key, _, _ in entries], [term for _, _, term in entries]
+    
+    @staticmethod
+    def _build_search_pool(data: Dict[str, TreeNodeRecord]) -> List[Tuple[TreeNodeRecord, str]]:
+        """
+        构建搜索文本池，仅在数据加载时执行一次小写化
+        
+        Args:
+            data: 解析后的节点字典
+            
+        Returns:
+            List[Tuple[TreeNodeRecord, str]]: (术语, 小写化的可搜索文本) 列表
+        """
+        # 以 NUL 分隔字段（XML 文本中不会出现），避免跨字段误匹配。
+        # 保留 str 而不编码为 bytes：str 的 in 直接走 fastsearch（two-way / memchr），
+        # bytes 的 in 每次调用都要经过缓冲区协议，逐术语判断时反而更慢
+        return [
+            (term, "\0".join(filter(None, [
+                term.label, term.label_zh, term.definition, term.definition_zh
+            ])).lower())
+            for term in data.values()
+        ]
+    
+    def get_all_terms(self) -> List[TreeNodeRecord]:
         """
         获取所有本体术语
         
         Returns:
-            List[TreeNode]: 本体术语列表
+            List[TreeNodeRecord]: 本体术语列表
         """
         data = self._get_parsed_data()
         return list(data.values())
     
-    def get_term_by_id(self, term_id: str) -> Optional[TreeNode]:
+    def get_term_by_id(self, term_id: str) -> Optional[TreeNodeRecord]:
         """
         根据ID获取本体术语
         
@@ -55,12 +222,12 @@ class OntologyService:
             term_id: 术语ID
             
         Returns:
-            Optional[TreeNode]: 本体术语，如果不存在则返回None
+            Optional[TreeNodeRecord]: 本体术语，如果不存在则返回None
         """
         data = self._get_parsed_data()
         return data.get(term_id)
     
-    def search_terms(self, query: str) -> List[TreeNode]:
+    def search_terms(self, query: str) -> List[TreeNodeRecord]:
         """
         搜索本体术语
         
@@ -68,47 +235,66 @@ class OntologyService:
             query: 搜索关键词
             
         Returns:
-            List[TreeNode]: 匹配的术语列表
+            List[TreeNodeRecord]: 匹配的术语列表
         """
-        data = self._get_parsed_data()
+        self._get_parsed_data()
         query_lower = query.lower()
-        results = []
         
-        for term in data.values():
-            # 搜索英文标签
-            if term.label and query_lower in term.label.lower():
-                results.append(term)
-                continue
-            
-            # 搜索中文标签
-            if term.label_zh and query_lower in term.label_zh.lower():
-                results.append(term)
-                continue
-            
-            # 搜索英文定义
-            if term.definition and query_lower in term.definition.lower():
-                results.append(term)
-                continue
+        # 命中最近查询的结果缓存（LRU），重复查询无需再次扫描
+        cached = self._search_results.get(query_lower)
+        if cached is not None:
+            self._search_results.move_to_end(query_lower)
+            return list(cached)
+        
+        results = [term for term, text in self._search_pool if query_lower in text]
+        
+        self._search_results[query_lower] = results
+        if len(self._search_results) > SEARCH_CACHE_SIZE:
+            self._search_results.popitem(last=False)
+        
+        return list(results)
+    
+    def prefix_search(self, prefix: str, limit: int = 20) -> List[TreeNodeRecord]:
+        """
+        按标签前缀搜索本体术语（用于输入联想）
+        
+        Args:
+            prefix: 标签前缀，不区分大小写
+            limit: 最多返回的术语数量
             
-            # 搜索中文定义
-            if term.definition_zh and query_lower in term.definition_zh.lower():
+        Returns:
+            List[TreeNodeRecord]: 标签以该前缀开头的术语列表，按标签排序
+        """
+        self._get_parsed_data()
+        prefix_lower = prefix.lower()
+        keys = self._prefix_keys
+        results = []
+        seen = set()
+        
+        # 二分定位第一个不小于前缀的标签，之后连续的标签即为全部匹配项
+        for index in range(bisect_left(keys, prefix_lower), len(keys)):
+            if len(results) >= limit or not keys[index].startswith(prefix_lower):
+                break
+            term = self._prefix_terms[index]
+            if term.id not in seen:
+                seen.add(term.id)
                 results.append(term)
-                continue
         
         return results
     
-    def export_to_json(self, output_file: Optional[str] = None) -> str:
+    def export_to_json(self, output_file: Optional[str] = None, pretty: bool = False) -> str:
         """
         导出本体数据为JSON文件
         
         Args:
             output_file: 输出文件路径，如果为None则自动生成
+            pretty: 是否缩进格式化输出，默认输出紧凑 JSON
             
         Returns:
             str: 输出文件路径
         """
         data = self._get_parsed_data()
-        return save_nodes_to_json(data, output_file)
+        return save_nodes_to_json(data, output_file, pretty=pretty)
     
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -120,28 +306,12 @@ class OntologyService:
         data = self._get_parsed_data()
         terms = list(data.values())
         
-        # 计算关系统计
-        subClassOf_relations = 0
-        partOf_relations = 0
-        leaf_nodes = 0
-        max_depth = 0
-        
-        for term in terms:
-            # 统计关系
-            for parent in term.parents:
-                if parent.relationType == "subClassOf":
-                    subClassOf_relations += 1
-                elif parent.relationType == "partOf":
-                    partOf_relations += 1
-            
-            # 统计叶子节点
-            if term.isLeaf:
-                leaf_nodes += 1
-            
-            # 计算深度（简单实现）
-            depth = len(term.parents)
-            max_depth = max(max_depth, depth)
+        # 计算关系统计：在连续的关系编码上计数，无需逐个访问关系对象
+        subClassOf_relations = self._edge_relations.count(RELATION_CODES["subClassOf"])
+        partOf_relations = self._edge_relations.count(RELATION_CODES["partOf"])
+        leaf_nodes = sum(1 for term in terms if term.isLeaf)
         
+        # 最大深度已在数据加载时按拓扑序计算
         return {
             "total_terms": len(terms),
             "total_classes": len(terms),  # 所有节点都是类
@@ -149,10 +319,16 @@ class OntologyService:
             "subClassOf_relations": subClassOf_relations,
             "partOf_relations": partOf_relations,
             "leaf_nodes": leaf_nodes,
-            "max_depth": max_depth
+            "max_depth": self._max_depth
         }
     
     def clear_cache(self):
         """清除缓存"""
         self._cache = None
-        self._cache_timestamp = None
\ No newline at end of file
+        self._cache_timestamp = None
+        self._search_pool = []
+        self._search_results.clear()
+        self._edge_relations = b""
+        self._max_depth = 0
+        self._prefix_keys = []
+        self._prefix_terms = []
\ No newline at end of file
@@ -1,45 +1,125 @@
-from rdflib import Graph, RDFS, RDF, Namespace, URIRef, Literal, OWL
-from typing import Dict
-import json
+from lxml import etree
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import orjson
 import os
 from datetime import datetime
-from app.models.schema import TreeNode, ParentRelation, ChildRelation
+from app.models.schema import TreeNodeRecord, ParentLink, ChildLink
 
-OBO = Namespace("http://purl.obolibrary.org/obo/")
-OBOINOWL = Namespace("http://www.geneontology.org/formats/oboInOwl#")
-PART_OF = OBO["BFO_0000050"]
+RDF = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+RDFS = "{http://www.w3.org/2000/01/rdf-schema#}"
+OWL = "{http://www.w3.org/2002/07/owl#}"
+OBO = "{http://purl.obolibrary.org/obo/}"
+OBOINOWL = "{http://www.geneontology.org/formats/oboInOwl#}"
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+PART_OF = "http://purl.obolibrary.org/obo/BFO_0000050"
 
+# 预先拼接的 Clark 形式标签/属性名，避免在解析循环中重复构造字符串
+RDF_ABOUT = RDF + "about"
+RDF_RESOURCE = RDF + "resource"
+RDFS_LABEL = RDFS + "label"
+RDFS_SUBCLASS_OF = RDFS + "subClassOf"
+OWL_CLASS = OWL + "Class"
+OWL_RESTRICTION = OWL + "Restriction"
+OWL_ON_PROPERTY = OWL + "onProperty"
+OWL_SOME_VALUES_FROM = OWL + "someValuesFrom"
+OBOINOWL_ID = OBOINOWL + "id"
+IAO_DEF = OBO + "IAO_0000115"
 
-def _get_literal(graph: Graph, subject: URIRef, predicate: URIRef, lang=None):
+
+# 需要提取文本的注解属性
+LITERAL_TAGS = frozenset({RDFS_LABEL, OBOINOWL_ID, IAO_DEF})
+
+
+def _collect_literals(elem: etree._Element) -> Dict[str, List[Tuple[Optional[str], str]]]:
+    """单次遍历子元素，按标签收集 (语言, 文本) 列表"""
+    literals: Dict[str, List[Tuple[Optional[str], str]]] = {}
+    for child in elem:
+        tag = child.tag
+        if tag not in LITERAL_TAGS or child.get(RDF_RESOURCE) is not None:
+            continue
+        literals.setdefault(tag, []).append((child.get(XML_LANG), child.text or ""))
+    return literals
+
+
+def _get_literal(literals: Dict[str, List[Tuple[Optional[str], str]]], tag: str, lang=None) -> Optional[str]:
     """获取指定语言的Literal文本"""
-    for obj in graph.objects(subject, predicate):
-        if isinstance(obj, Literal):
-            if lang is None or obj.language == lang:
-                return str(obj)
+    for literal_lang, text in literals.get(tag, ()):
+        if lang is None or literal_lang == lang:
+            return text
     return None
 
 
-def parse_ontology(file_path: str) -> Dict[str, TreeNode]:
+# 流式解析产出的类记录：(节点 ID, IRI, 英文标签, 中文标签, 英文定义, 中文定义, [(父类 IRI, 关系类型)])
+ClassTuple = Tuple[str, str, Optional[str], Optional[str], Optional[str], Optional[str], List[Tuple[str, str]]]
+
+
+def _parse_xml_stream(file_path: str) -> Iterator[ClassTuple]:
     """
-    解析 OWL 文件，返回以 ID 为键的 TreeNode 字典。
+    流式读取 OWL 文件中的 owl:Class 元素，逐个产出纯字符串组成的类记录。
     - 子类→父类：rdfs:subClassOf
     - 部分关系：obo:BFO_0000050 (part_of)
     """
-    g = Graph()
-    g.parse(file_path, format="xml")
+    for _, elem in etree.iterparse(file_path, events=("end",), tag=OWL_CLASS):
+        iri = elem.get(RDF_ABOUT)
+        if iri is None:
+            # 匿名类由外层元素负责清理
+            continue
 
-    nodes: Dict[str, TreeNode] = {}
+        literals = _collect_literals(elem)
+        node_id = _get_literal(literals, OBOINOWL_ID) or iri.rsplit("/", 1)[-1]
+        parents: List[Tuple[str, str]] = []
 
-    # === Step 1: 构建所有节点（只处理 owl:Class） ===
-    for s in g.subjects(RDF.type, OWL.Class):
-        iri = str(s)
-        node_id = _get_literal(g, s, OBOINOWL.id) or iri.split("/")[-1]
-        label = _get_literal(g, s, RDFS.label)
-        label_zh = _get_literal(g, s, RDFS.label, lang="zh")
-        definition = _get_literal(g, s, OBO["IAO_0000115"])
-        definition_zh = _get_literal(g, s, OBO["IAO_0000115"], lang="zh")
+        for sub in elem.iterchildren(RDFS_SUBCLASS_OF):
+            # 命名父类直接以 rdf:resource 属性给出，只有缺少该属性时才查找 owl:Restriction
+            parent_iri = sub.get(RDF_RESOURCE)
+            if parent_iri is not None:
+                parents.append((parent_iri, "subClassOf"))
+                continue
+
+            # part_of 关系通过 owl:Restriction 定义
+            restriction = sub.find(OWL_RESTRICTION)
+            if restriction is None:
+                continue
+            on_property = restriction.find(OWL_ON_PROPERTY)
+            if on_property is None or on_property.get(RDF_RESOURCE) != PART_OF:
+                continue
+            for values_from in restriction.iterchildren(OWL_SOME_VALUES_FROM):
+                parent_iri = values_from.get(RDF_RESOURCE)
+                if parent_iri is not None:
+                    parents.append((parent_iri, "partOf"))
+
+        record = (
+            node_id,
+            iri,
+            _get_literal(literals, RDFS_LABEL),
+            _get_literal(literals, RDFS_LABEL, lang="zh"),
+            _get_literal(literals, IAO_DEF),
+            _get_literal(literals, IAO_DEF, lang="zh"),
+            parents,
+        )
+
+        # 释放已处理的元素，保持内存占用平稳
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+        yield record
+
+
+def _assemble_nodes(classes: Iterable[ClassTuple]) -> Dict[str, TreeNodeRecord]:
+    """
+    由类记录组装以 ID 为键的 TreeNodeRecord 字典，并建立父子关系。
+    """
+    nodes: Dict[str, TreeNodeRecord] = {}
+    iri_to_id: Dict[str, str] = {}
+    # (子类 ID, 父类 IRI, 关系类型)；父类 IRI 在全部节点创建完成后再解析为 ID
+    edges: List[Tuple[str, str, str]] = []
+    add_edge = edges.append
 
-        nodes[node_id] = TreeNode(
+    # === Step 1: 构建所有节点，同时收集关系 ===
+    for node_id, iri, label, label_zh, definition, definition_zh, parents in classes:
+        iri_to_id[iri] = node_id
+        nodes[node_id] = TreeNodeRecord(
             id=node_id,
             label=label,
             label_zh=label_zh,
@@ -47,71 +127,74 @@ def parse_ontology(file_path: str) -> Dict[str, TreeNode]:
             definition_zh=definition_zh,
             iri=iri,
         )
+        for parent_iri, relation_type in parents:
+            add_edge((node_id, parent_iri, relation_type))
 
-    # === Step 2: 建立 subClassOf 父子关系 ===
-    for s, _, o in g.triples((None, RDFS.subClassOf, None)):
-        # 跳过指向 owl:Restriction 的关系，这些会在 Step 3 中处理
-        if (o, RDF.type, OWL.Restriction) in g:
-            continue
-            
-        child_id = _get_literal(g, s, OBOINOWL.id) or str(s).split("/")[-1]
-        parent_id = _get_literal(g, o, OBOINOWL.id) or str(o).split("/")[-1]
-
-        # 创建节点（若还不存在）
-        if child_id not in nodes:
-            nodes[child_id] = TreeNode(id=child_id)
-        if parent_id not in nodes:
-            nodes[parent_id] = TreeNode(id=parent_id)
-
-        nodes[child_id].parents.append(
-            ParentRelation(parentId=parent_id, relationType="subClassOf")
-        )
-        nodes[parent_id].children.append(
-            ChildRelation(childId=child_id, relationType="subClassOf")
-        )
-        nodes[parent_id].isLeaf = False
-
-    # === Step 3: 建立 part_of 父子关系 ===
-    # part_of 关系通过 owl:Restriction 定义，需要特殊处理
-    for s, _, restriction in g.triples((None, RDFS.subClassOf, None)):
-        # 检查是否指向 owl:Restriction
-        if (restriction, RDF.type, OWL.Restriction) in g:
-            # 检查 owl:onProperty 是否为 part_of
-            for _, _, property_uri in g.triples((restriction, OWL.onProperty, None)):
-                if str(property_uri) == str(PART_OF):
-                    # 获取 owl:someValuesFrom 指向的父类
-                    for _, _, parent_uri in g.triples((restriction, OWL.someValuesFrom, None)):
-                        child_id = _get_literal(g, s, OBOINOWL.id) or str(s).split("/")[-1]
-                        parent_id = _get_literal(g, parent_uri, OBOINOWL.id) or str(parent_uri).split("/")[-1]
-
-                        # 创建节点（若还不存在）
-                        if child_id not in nodes:
-                            nodes[child_id] = TreeNode(id=child_id)
-                        if parent_id not in nodes:
-                            nodes[parent_id] = TreeNode(id=parent_id)
-
-                        nodes[child_id].parents.append(
-                            ParentRelation(parentId=parent_id, relationType="partOf")
-                        )
-                        nodes[parent_id].children.append(
-                            ChildRelation(childId=child_id, relationType="partOf")
-                        )
-                        nodes[parent_id].isLeaf = False
-
-    # === Step 4: 统计子节点数量 ===
+    # === Step 2: 单次遍历建立 subClassOf / part_of 父子关系 ===
+    for child_id, parent_iri, relation_type in edges:
+        parent_id = iri_to_id.get(parent_iri)
+        if parent_id is None:
+            # 父类未声明为 owl:Class，回退为 IRI 末段并缓存，同一 IRI 只解析一次
+            parent_id = iri_to_id[parent_iri] = parent_iri.rsplit("/", 1)[-1]
+
+        # 创建父节点（若还不存在），子节点已在 Step 1 中创建
+        parent = nodes.get(parent_id)
+        if parent is None:
+            parent = nodes[parent_id] = TreeNodeRecord(id=parent_id)
+
+        nodes[child_id].parents.append(ParentLink(parent_id, relation_type))
+        parent.children.append(ChildLink(child_id, relation_type))
+        parent.isLeaf = False
+
+    # === Step 3: 统计子节点数量 ===
     for node in nodes.values():
         node.count = len(node.children)
 
     return nodes
 
 
-def save_nodes_to_json(nodes: Dict[str, TreeNode], output_file: str = None) -> str:
+def parse_ontology(file_path: str) -> Dict[str, TreeNodeRecord]:
+    """
+    解析 OWL 文件，返回以 ID 为键的 TreeNodeRecord 字典。
+    - 子类→父类：rdfs:subClassOf
+    - 部分关系：obo:BFO_0000050 (part_of)
+
+    使用 lxml iterparse 流式读取 owl:Class 元素，不再构建完整的三元组图。
+    节点使用轻量的 TreeNodeRecord 存储，接口层再转换为 TreeNode。
+    """
+    return _assemble_nodes(_parse_xml_stream(file_path))
+
+
+def _node_to_dict(node: TreeNodeRecord) -> Dict[str, Any]:
+    """直接读取属性构建可序列化的字典，避免逐实例的反射式序列化"""
+    return {
+        "id": node.id,
+        "label": node.label,
+        "label_zh": node.label_zh,
+        "definition": node.definition,
+        "definition_zh": node.definition_zh,
+        "iri": node.iri,
+        "isLeaf": node.isLeaf,
+        "count": node.count,
+        "children": [
+            {"childId": child.childId, "relationType": child.relationType}
+            for child in node.children
+        ],
+        "parents": [
+            {"parentId": parent.parentId, "relationType": parent.relationType}
+            for parent in node.parents
+        ],
+    }
+
+
+def save_nodes_to_json(nodes: Dict[str, TreeNodeRecord], output_file: str = None, pretty: bool = False) -> str:
     """
     将解析的节点数据保存为 JSON 文件
     
     Args:
         nodes: 解析后的节点字典
         output_file: 输出文件路径，如果为 None 则自动生成
+        pretty: 是否缩进格式化输出（便于人工查看），默认输出紧凑 JSON
     
     Returns:
         str: 保存的文件路径
@@ -125,10 +208,8 @@ def save_nodes_to_json(nodes: Dict[str, TreeNode], output_file: str = None) -> s
     output_dir = os.path.dirname(output_file) if os.path.dirname(output_file) else "."
     os.makedirs(output_dir, exist_ok=True)
     
-    # 将 TreeNode 对象转换为字典
-    nodes_data = {}
-    for node_id, node in nodes.items():
-        nodes_data[node_id] = node.dict()
+    # 将 TreeNodeRecord 对象转换为字典
+    nodes_data = {node_id: _node_to_dict(node) for node_id, node in nodes.items()}
     
     # 创建包含元数据的完整数据结构
     output_data = {
@@ -141,8 +222,9 @@ def save_nodes_to_json(nodes: Dict[str, TreeNode], output_file: str = None) -> s
     }
     
     # 保存为 JSON 文件
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    option = orjson.OPT_INDENT_2 if pretty else None
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(output_data, option=option))
     
     print(f"✅ 节点数据已保存到: {output_file}")
     print(f"📊 共保存 {len(nodes)} 个节点")
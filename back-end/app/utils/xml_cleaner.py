@@ -8,7 +8,7 @@ XML 特殊字符清理工具
 
 import re
 import os
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 class XMLCleaner:
@@ -32,6 +32,20 @@ class XMLCleaner:
         '&apos;': "'"
     }
     
+    # 单次遍历所用的转义表与反转义正则
+    XML_ESCAPE_TABLE = str.maketrans(XML_ESCAPE_MAP)
+    XML_UNESCAPE_PATTERN = re.compile('|'.join(map(re.escape, XML_UNESCAPE_MAP)))
+    
+    # 需要清理的标签模式，单次扫描同时匹配以下四种形式：
+    # <rdfs:label>、<rdfs:label xml:lang="zh">、<obo:IAO_0000115>、<obo:IAO_0000115 xml:lang="zh">
+    TAG_PATTERN = re.compile(
+        r'<(rdfs:label|obo:IAO_0000115)( xml:lang="zh")?>(.*?)</\1>',
+        re.DOTALL
+    )
+    
+    # 需要清理的标签起始模式（用于检测跨行标签）
+    OPEN_TAG_PATTERN = re.compile(r'<(rdfs:label|obo:IAO_0000115)(?: xml:lang="zh")?>')
+    
     def __init__(self):
         """初始化 XML 清理器"""
         self.cleaned_count = 0
@@ -50,12 +64,8 @@ class XMLCleaner:
         if not text:
             return text
             
-        # 按顺序转义，& 必须首先处理
-        escaped_text = text
-        for char, replacement in self.XML_ESCAPE_MAP.items():
-            escaped_text = escaped_text.replace(char, replacement)
-        
-        return escaped_text
+        # 单次遍历逐字符替换，不会对 & 重复转义
+        return text.translate(self.XML_ESCAPE_TABLE)
     
     def unescape_xml_chars(self, text: str) -> str:
         """
@@ -70,12 +80,10 @@ class XMLCleaner:
         if not text:
             return text
             
-        # 按顺序恢复，&amp; 必须最后处理
-        unescaped_text = text
-        for replacement, char in self.XML_UNESCAPE_MAP.items():
-            unescaped_text = unescaped_text.replace(replacement, char)
-        
-        return unescaped_text
+        # 单次遍历匹配实体，恢复结果不会被再次解析
+        return self.XML_UNESCAPE_PATTERN.sub(
+            lambda match: self.XML_UNESCAPE_MAP[match.group()], text
+        )
     
     def clean_owl_file(self, input_file: str, output_file: str = None) -> str:
         """
@@ -98,15 +106,11 @@ class XMLCleaner:
         print(f"🧹 开始清理 OWL 文件: {input_file}")
         
         try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 清理内容
-            cleaned_content = self._clean_xml_content(content)
-            
-            # 写入清理后的文件
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(cleaned_content)
+            # 逐行流式清理，避免将整个文件读入内存
+            with open(input_file, 'r', encoding='utf-8') as src, \
+                    open(output_file, 'w', encoding='utf-8') as dst:
+                for chunk in self._iter_chunks(src):
+                    dst.write(self._clean_xml_content(chunk))
             
             print(f"✅ 清理完成，输出文件: {output_file}")
             print(f"📊 统计信息:")
@@ -120,6 +124,53 @@ class XMLCleaner:
             self.error_count += 1
             raise
     
+    def _iter_chunks(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        按行产出待清理的文本片段，目标标签跨行时合并为一个片段
+        
+        Args:
+            lines: 逐行读取的 XML 内容
+            
+        Returns:
+            Iterator[str]: 不会截断目标标签的文本片段
+        """
+        buffer = []
+        pending_close = None
+        
+        for line in lines:
+            buffer.append(line)
+            if pending_close is not None and pending_close not in line:
+                continue
+            
+            chunk = ''.join(buffer)
+            pending_close = self._find_unclosed_tag(chunk)
+            if pending_close is None:
+                yield chunk
+                buffer = []
+        
+        if buffer:
+            yield ''.join(buffer)
+    
+    def _find_unclosed_tag(self, text: str) -> Optional[str]:
+        """
+        查找文本中最后一个未闭合的目标标签
+        
+        Args:
+            text: XML 文本片段
+            
+        Returns:
+            Optional[str]: 缺失的闭合标签，全部闭合时返回 None
+        """
+        last_match = None
+        for last_match in self.OPEN_TAG_PATTERN.finditer(text):
+            pass
+        
+        if last_match is None:
+            return None
+        
+        close_tag = f'</{last_match.group(1)}>'
+        return None if close_tag in text[last_match.end():] else close_tag
+    
     def _clean_xml_content(self, content: str) -> str:
         """
         清理 XML 内容中的特殊字符
@@ -130,37 +181,22 @@ class XMLCleaner:
         Returns:
             str: 清理后的内容
         """
-        # 定义需要清理的标签模式
-        patterns = [
-            # <rdfs:label xml:lang="zh">...</rdfs:label>
-            (r'<rdfs:label xml:lang="zh">(.*?)</rdfs:label>', 'rdfs:label'),
-            # <obo:IAO_0000115 xml:lang="zh">...</obo:IAO_0000115>
-            (r'<obo:IAO_0000115 xml:lang="zh">(.*?)</obo:IAO_0000115>', 'obo:IAO_0000115'),
-            # 也处理没有 xml:lang 属性的情况
-            (r'<rdfs:label>(.*?)</rdfs:label>', 'rdfs:label'),
-            (r'<obo:IAO_0000115>(.*?)</obo:IAO_0000115>', 'obo:IAO_0000115')
-        ]
-        
-        cleaned_content = content
-        
-        for pattern, tag_name in patterns:
-            def replace_func(match):
-                original_text = match.group(1)
-                escaped_text = self.escape_xml_chars(original_text)
-                
-                if escaped_text != original_text:
-                    self.cleaned_count += 1
-                    print(f"  🔧 清理 {tag_name}: '{original_text}' -> '{escaped_text}'")
-                
-                return match.group(0).replace(original_text, escaped_text)
+        def replace_func(match):
+            tag_name, lang_attr, original_text = match.groups()
+            escaped_text = self.escape_xml_chars(original_text)
             
-            try:
-                cleaned_content = re.sub(pattern, replace_func, cleaned_content, flags=re.DOTALL)
-            except Exception as e:
-                print(f"  ⚠️  处理 {tag_name} 时发生错误: {str(e)}")
-                self.error_count += 1
+            if escaped_text != original_text:
+                self.cleaned_count += 1
+                print(f"  🔧 清理 {tag_name}: '{original_text}' -> '{escaped_text}'")
+            
+            return f'<{tag_name}{lang_attr or ""}>{escaped_text}</{tag_name}>'
         
-        return cleaned_content
+        try:
+            return self.TAG_PATTERN.sub(replace_func, content)
+        except Exception as e:
+            print(f"  ⚠️  清理标签时发生错误: {str(e)}")
+            self.error_count += 1
+            return content
     
     def validate_xml_escaping(self, text: str) -> bool:
         """